@@ -20,7 +20,7 @@ CIK_TO_TICKER = get_cik_to_ticker()
 
 # Form types to alert on (SEC form type codes).
 # 8-K = current report (material events, often redemption/call); 424B* = prospectus supplements; N-2 = CEF.
-FORM_TYPES = {
+FORM_TYPES = frozenset({
     "8-K",
     "424B2",
     "424B3",
@@ -29,27 +29,49 @@ FORM_TYPES = {
     "424B7",
     "N-2",
     "DEF 14A",
+})
+
+# Form types whose event type is implied by the form itself. In single-filing mode these skip the
+# primary-doc fetch and classification; only the rest (mainly 8-K, 424B*) are fetched and classified.
+FORM_TO_EVENT = {
+    "N-2": "PREF_NEW_ISSUE",
+    "DEF 14A": "GENERIC_NEWS",
 }
 
+# Parallel SEC submissions requests per poll. The overall rate is capped separately (sec_ratelimit, 9 req/s).
+SEC_MAX_CONCURRENCY = 8
+
 # How often to poll the SEC (minutes). Stay respectful of SEC rate limits.
 POLL_INTERVAL_MINUTES = 5
 
-# State file to remember last-seen filings and avoid duplicate alerts.
+# State file for cached document classifications (and, in older versions, seen filings).
 STATE_FILE = "bot_state.json"
 
+# Append-only log of seen accession numbers (one per line) to avoid duplicate alerts.
+SEEN_LOG_FILE = "bot_seen.txt"
+
 # Only alert on filings from the last N days (avoids spamming old filings on first run).
 MAX_FILING_AGE_DAYS = 7
 
-# Cap size of seen_accessions in state so it does not grow forever.
+# Cap number of seen accessions kept (the log is compacted to this) so it does not grow forever.
 MAX_SEEN_ACCESSIONS = 5000
 
+# Cap number of cached document classifications kept in state (keyed by document content hash).
+MAX_CLASSIFY_CACHE = 1000
+
 # Group new filings by (cik, form_type, filing_date) and send one Telegram message per group (digest).
 ALERT_DIGEST_BY_GROUP = True
 
+# Pack consecutive digests from one run into as few Telegram messages as fit in 4096 chars (fewer API calls / 429s).
+ALERT_DIGEST_COALESCE = True
+
 # Max new alert groups (or single filings) to process per run; rest are sent in a later run. None = no cap. Set env to 0 for no cap.
 _max_per_run = os.getenv("MAX_NEW_ALERTS_PER_RUN", "200").strip()
 MAX_NEW_ALERTS_PER_RUN = int(_max_per_run) if _max_per_run and _max_per_run != "0" else None
 
+# Worker threads fetching + classifying primary documents in single-filing mode (requests still throttled).
+SEC_DOC_FETCH_WORKERS = 4
+
 # Seconds to wait between Telegram sends to avoid 429 rate limit.
 TELEGRAM_SEND_DELAY_SEC = 1.2
 
@@ -195,20 +195,203 @@ RULES: list[EventRule] = [
 ]
 
 
-def _count_regex_hits(text: str, patterns: list[str]) -> int:
+def _split_top_level(pat: str) -> tuple[list[str], bool]:
     """
-    Count how many patterns match at least once (case-insensitive).
-    Each pattern counts at most once.
+    Split pat on ".*" outside groups/classes. Returns (segments, has_top_level_alternation).
+    """
+    segments: list[str] = []
+    current: list[str] = []
+    depth = 0
+    has_alt = False
+    i = 0
+    while i < len(pat):
+        c = pat[i]
+        if c == "\\":
+            current.append(pat[i : i + 2])
+            i += 2
+            continue
+        if c in "([":
+            depth += 1
+        elif c in ")]":
+            depth -= 1
+        elif c == "|" and depth == 0:
+            has_alt = True
+        elif c == "." and depth == 0 and pat[i + 1 : i + 2] == "*":
+            segments.append("".join(current))
+            current = []
+            i += 2
+            continue
+        current.append(c)
+        i += 1
+    segments.append("".join(current))
+    return segments, has_alt
+
+
+def _literal_anchors(pat: str) -> tuple[str, ...]:
+    """
+    Lowercase literals that every match of pat must contain: the leading literal of each top-level
+    ".*"-separated segment (a ".*" inside a group or class is not a split point). Empty if the
+    pattern has a top-level "|" (no single required literal).
+    """
+    segments, has_alt = _split_top_level(pat)
+    if has_alt:
+        return ()
+    anchors: list[str] = []
+    for segment in segments:
+        out: list[str] = []
+        for c in segment.replace(r"\b", ""):
+            if c in "?*{":
+                # Quantifier makes the previous char optional.
+                if out:
+                    out.pop()
+                break
+            if c in ".()[]\\+|^$":
+                break
+            out.append(c)
+        literal = "".join(out).strip().lower()
+        if literal:
+            anchors.append(literal)
+    return tuple(anchors)
+
+
+def _word_literal(pat: str) -> str | None:
+    """
+    If pat is just \\bPHRASE\\b with a plain phrase (letters, digits, spaces, hyphens),
+    return the phrase lowercased; such patterns are matched with str.find instead of regex.
+    """
+    if not (pat.startswith(r"\b") and pat.endswith(r"\b")):
+        return None
+    phrase = pat[2:-2]
+    if not phrase or not phrase[0].isalnum() or not phrase[-1].isalnum():
+        return None
+    if not all(c.isalnum() or c in " -" for c in phrase):
+        return None
+    return phrase.lower()
+
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+
+def _contains_word(lower: str, phrase: str) -> bool:
+    """Same as re.search(r"\\b" + phrase + r"\\b", lower) for a phrase starting and ending with a word char."""
+    n = len(lower)
+    idx = lower.find(phrase)
+    while idx >= 0:
+        end = idx + len(phrase)
+        if (idx == 0 or not _is_word_char(lower[idx - 1])) and (end == n or not _is_word_char(lower[end])):
+            return True
+        idx = lower.find(phrase, idx + 1)
+    return False
+
+
+def _chain_segments(pat: str) -> tuple[re.Pattern[str], ...] | None:
+    """
+    For "A.*B(.*C...)" patterns (no top-level "|"), the compiled segments A, B, ...; else None.
+    """
+    segments, has_alt = _split_top_level(pat)
+    if has_alt or len(segments) < 2 or not all(segments):
+        return None
+    # A segment starting with a quantifier means the ".*" was itself quantified (lazy ".*?", ".*+", ".*{n}"):
+    # not a plain split point, so leave the pattern to the full regex.
+    if any(seg[0] in "?*+{" for seg in segments[1:]):
+        return None
+    try:
+        return tuple(re.compile(seg, re.IGNORECASE) for seg in segments)
+    except re.error:
+        return None
+
+
+def _search_chain(text: str, segments: tuple[re.Pattern[str], ...]) -> bool:
+    """
+    Same result as re.search("A.*B...", text, re.IGNORECASE) in linear time. The backtracking
+    engine retries ".*B" from every occurrence of A (quadratic when B is missing); here, per line
+    (".*" does not cross newlines), each later segment is searched once after the first A match.
+    """
+    first, rest = segments[0], segments[1:]
+    n = len(text)
+    pos = 0
+    while pos <= n:
+        m = first.search(text, pos)
+        if not m:
+            return False
+        line_end = text.find("\n", m.end())
+        if line_end < 0:
+            line_end = n
+        cur = m.end()
+        for seg in rest:
+            m = seg.search(text, cur, line_end)
+            if not m:
+                break
+            cur = m.end()
+        else:
+            return True
+        pos = line_end + 1
+    return False
+
+
+@dataclass(frozen=True)
+class _CompiledPattern:
+    regex: re.Pattern[str]
+    anchors: tuple[str, ...]  # lowercase literals required for a match (prefilter)
+    literal: str | None  # set when the whole pattern is a \b-delimited phrase
+    chain: tuple[re.Pattern[str], ...] | None  # set for "A.*B" patterns (see _search_chain)
+
+    def search(self, text: str) -> bool:
+        if self.chain is not None:
+            return _search_chain(text, self.chain)
+        return self.regex.search(text) is not None
+
+
+# Compiled once at import (case-insensitive); a bad pattern fails loudly here rather than per filing.
+# Patterns are searched one by one rather than fused into one big (?P<R0>...)|(?P<R1>...) alternation:
+# CPython's re has no multi-literal prefilter, so a fused scan tries every alternative at every position
+# (measured 2-3x slower than separate searches), and finditer would also drop overlapping matches and
+# let a greedy ".*" swallow the rest of the document. Instead each pattern is gated on its literal
+# anchors, which str's substring search checks far faster than a regex with a leading \b.
+_COMPILED_RULES: list[tuple[EventRule, tuple[_CompiledPattern, ...]]] = [
+    (
+        rule,
+        tuple(
+            _CompiledPattern(re.compile(p, re.IGNORECASE), _literal_anchors(p), _word_literal(p), _chain_segments(p))
+            for p in rule.patterns
+        ),
+    )
+    # Highest priority first (stable for equal priorities), so classify_event can stop early.
+    for rule in sorted(RULES, key=lambda r: -r.priority)
+]
+
+
+def _rule_confidence(rule: EventRule, hits: int) -> float:
+    return min(rule.cap, rule.base + rule.per_hit * max(0, hits - 1))
+
+
+# _REMAINING_MAX_CONF[i]: best confidence any rule from _COMPILED_RULES[i:] could reach (all patterns hit).
+_REMAINING_MAX_CONF: list[float] = []
+for _rule, _compiled in reversed(_COMPILED_RULES):
+    _REMAINING_MAX_CONF.append(
+        max(_rule_confidence(_rule, len(_compiled)), _REMAINING_MAX_CONF[-1] if _REMAINING_MAX_CONF else 0.0)
+    )
+_REMAINING_MAX_CONF.reverse()
+del _rule, _compiled
+
+
+def _count_regex_hits(text: str, lower: str, patterns: tuple[_CompiledPattern, ...]) -> int:
+    """
+    Count how many compiled patterns match at least once.
+    Each pattern counts at most once. lower is text.lower(); patterns whose literal
+    anchors are missing from it are skipped without running the regex, and plain
+    phrase patterns are checked on lower without regex at all.
     """
     if not text:
         return 0
     hits = 0
     for pat in patterns:
-        try:
-            if re.search(pat, text, flags=re.IGNORECASE):
+        if pat.literal is not None:
+            if _contains_word(lower, pat.literal):
                 hits += 1
-        except re.error:
-            continue
+        elif all(a in lower for a in pat.anchors) and pat.search(text):
+            hits += 1
     return hits
 
 
@@ -226,10 +409,21 @@ def _pattern_to_evidence_phrase(pat: str) -> str:
     return "".join(out).strip()
 
 
-def classify_event(plain_text: str) -> tuple[str, float]:
+# Evidence phrases per event type, derived once from RULES (first rule per event type wins).
+_EVIDENCE_PHRASES: dict[str, tuple[str, ...]] = {}
+for _rule in RULES:
+    _EVIDENCE_PHRASES.setdefault(
+        _rule.event_type,
+        tuple(ph for ph in (_pattern_to_evidence_phrase(p) for p in _rule.patterns) if ph),
+    )
+del _rule
+
+
+def classify_event(plain_text: str, lower: str | None = None) -> tuple[str, float]:
     """
     Returns (event_type, confidence). Confidence in [0, 1].
     Rule confidence: base + per_hit*(hits-1), capped. Tie broken by priority.
+    lower: plain_text.lower(), if the caller already has it (shared with extract_snippets).
     """
     if not (plain_text and plain_text.strip()):
         return GENERIC_NEWS, 0.2
@@ -238,12 +432,18 @@ def classify_event(plain_text: str) -> tuple[str, float]:
     best_conf = 0.2
     best_pri = -1
 
-    for rule in RULES:
-        hits = _count_regex_hits(plain_text, rule.patterns)
+    if lower is None:
+        lower = plain_text.lower()
+    for i, (rule, compiled) in enumerate(_COMPILED_RULES):
+        # Remaining rules have lower (or equal) priority, so they only win with a strictly higher
+        # confidence; stop once none of them can reach it.
+        if best_conf >= _REMAINING_MAX_CONF[i]:
+            break
+        hits = _count_regex_hits(plain_text, lower, compiled)
         if hits <= 0:
             continue
 
-        conf = min(rule.cap, rule.base + rule.per_hit * max(0, hits - 1))
+        conf = _rule_confidence(rule, hits)
 
         if (conf > best_conf) or (conf == best_conf and rule.priority > best_pri):
             best_type = rule.event_type
@@ -258,27 +458,26 @@ def get_phrases_for_event(event_type: str) -> list[str]:
     Return plain-string phrases for an event type (for evidence snippet extraction).
     Derived from regex patterns so evidence_snippets can use substring search.
     """
-    for rule in RULES:
-        if rule.event_type == event_type:
-            phrases = [_pattern_to_evidence_phrase(p) for p in rule.patterns]
-            return [p for p in phrases if p]
-    return []
+    return list(_EVIDENCE_PHRASES.get(event_type, ()))
+
+
+# Human-readable labels, built once (event_type_display_name runs per alert and per keyboard button).
+_DISPLAY_NAMES = {
+    PREF_CALL: "Redemption / Call",
+    PREF_PARTIAL_CALL: "Partial call / Redemption",
+    PREF_NEW_ISSUE: "New preferred issue / terms",
+    DIV_SUSPENSION: "Dividend suspension / omission",
+    OFFERING: "Offering / ATM",
+    RIGHTS_OFFERING: "Rights offering",
+    TENDER_OFFER: "Tender offer / repurchase",
+    EXCHANGE_OFFER: "Exchange offer / consent",
+    CEF_DISTRIBUTION_CHANGE: "CEF distribution change",
+    LIQUIDATION_TERMINATION: "Liquidation / Termination",
+    EARNINGS: "Earnings / earnings call",
+    GENERIC_NEWS: "Filing",
+}
 
 
 def event_type_display_name(event_type: str) -> str:
     """Human-readable label for Telegram."""
-    labels = {
-        PREF_CALL: "Redemption / Call",
-        PREF_PARTIAL_CALL: "Partial call / Redemption",
-        PREF_NEW_ISSUE: "New preferred issue / terms",
-        DIV_SUSPENSION: "Dividend suspension / omission",
-        OFFERING: "Offering / ATM",
-        RIGHTS_OFFERING: "Rights offering",
-        TENDER_OFFER: "Tender offer / repurchase",
-        EXCHANGE_OFFER: "Exchange offer / consent",
-        CEF_DISTRIBUTION_CHANGE: "CEF distribution change",
-        LIQUIDATION_TERMINATION: "Liquidation / Termination",
-        EARNINGS: "Earnings / earnings call",
-        GENERIC_NEWS: "Filing",
-    }
-    return labels.get(event_type, event_type or "Filing")
+    return _DISPLAY_NAMES.get(event_type, event_type or "Filing")
@@ -2,6 +2,8 @@
 Extract short evidence snippets from plain text around matched phrases.
 """
 
+from __future__ import annotations
+
 
 def extract_snippets(
     plain_text: str,
@@ -9,18 +11,20 @@ def extract_snippets(
     window_chars: int = 250,
     max_snippets: int = 3,
     max_snippet_len: int = 200,
+    lower: str | None = None,
 ) -> list[str]:
     """
     For each phrase, find first occurrence (case-insensitive), take a window of
     window_chars before/after, clean (normalize whitespace), truncate to max_snippet_len.
     Return at most max_snippets unique snippets (by phrase order; avoid duplicate spans).
+    plain_text is expected whitespace-normalized (as extract_text returns it);
+    lower: plain_text.lower(), if the caller already has it.
     """
     if not plain_text or not phrases:
         return []
 
-    lower = plain_text.lower()
-    normalized = " ".join(plain_text.split())
-    lower_norm = " ".join(lower.split())
+    if lower is None:
+        lower = plain_text.lower()
     seen_starts: set[int] = set()
     snippets: list[str] = []
 
@@ -28,7 +32,7 @@ def extract_snippets(
         if len(snippets) >= max_snippets:
             break
         p_lower = phrase.lower()
-        idx = lower_norm.find(p_lower)
+        idx = lower.find(p_lower)
         if idx < 0:
             continue
         # Avoid returning same span twice (approximate: same start)
@@ -37,9 +41,9 @@ def extract_snippets(
         seen_starts.add(idx)
 
         start = max(0, idx - window_chars)
-        end = min(len(normalized), idx + len(phrase) + window_chars)
-        snip = normalized[start:end].strip()
-        snip = " ".join(snip.split())
+        end = min(len(plain_text), idx + len(phrase) + window_chars)
+        # Normalize only the window; split() also drops leading/trailing whitespace.
+        snip = " ".join(plain_text[start:end].split())
         if len(snip) > max_snippet_len:
             snip = snip[: max_snippet_len - 3] + "..."
         if not snip:
@@ -2,18 +2,23 @@
 BAMSec Filing Bot — poll SEC for watchlist filings and notify via Telegram.
 """
 
+from __future__ import annotations
+
+import hashlib
 import json
 import logging
 import os
 import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import config
-from event_classifier import classify_event, get_phrases_for_event
+from event_classifier import RULES, classify_event, get_phrases_for_event
 from evidence_snippets import extract_snippets
 from sec_archives import SecHttpClient
-from sec_fetcher import fetch_all_watchlist_filings
-from telegram_notifier import send_digest_alert_sync, send_filing_alert_sync
+from sec_fetcher import fetch_all_watchlist_filings, filing_date_cutoff
+from telegram_notifier import send_digest_alerts_sync, send_filing_alerts_sync
 from text_extract import extract_text
 
 logging.basicConfig(
@@ -24,34 +29,129 @@ logging.basicConfig(
 log = logging.getLogger(__name__)
 
 
-def load_seen_accessions() -> set[str]:
+# Folded into classify-cache keys so cached results are not reused after RULES change.
+_RULES_FINGERPRINT = hashlib.blake2b(repr(RULES).encode(), digest_size=8).digest()
+
+
+def _load_state() -> dict:
     state_path = Path(config.STATE_FILE)
     if not state_path.exists():
-        return set()
+        return {}
     try:
-        with open(state_path) as f:
-            data = json.load(f)
-        return set(data.get("seen_accessions", []))
+        data = json.loads(state_path.read_bytes())
+        return data if isinstance(data, dict) else {}
     except Exception:
-        return set()
+        return {}
 
 
-def save_seen_accessions(seen: set[str]) -> None:
-    state_path = Path(config.STATE_FILE)
+# Lines currently in SEEN_LOG_FILE (including superseded ones); drives compaction.
+_seen_log_lines = 0
+
+
+def load_seen_accessions() -> OrderedDict[str, None]:
+    """
+    Seen accession numbers, oldest first, from SEEN_LOG_FILE (one per line, append-only).
+    Falls back to the seen_accessions list in older STATE_FILE versions; the first save then
+    writes it out as the new log.
+    """
+    global _seen_log_lines
+    log_path = Path(getattr(config, "SEEN_LOG_FILE", "bot_seen.txt"))
+    if log_path.exists():
+        try:
+            lines = log_path.read_text().splitlines()
+        except Exception:
+            lines = []
+        _seen_log_lines = len(lines)
+        seen = OrderedDict.fromkeys(line for line in lines if line)
+    else:
+        seen = OrderedDict.fromkeys(_load_state().get("seen_accessions", []))
+    cap = getattr(config, "MAX_SEEN_ACCESSIONS", 5000)
+    while len(seen) > cap:
+        seen.popitem(last=False)
+    return seen
+
+
+def _mark_seen(seen: OrderedDict[str, None], acc: str) -> None:
+    """Record acc as seen; evict the oldest entries beyond MAX_SEEN_ACCESSIONS."""
+    seen[acc] = None
+    seen.move_to_end(acc)
     cap = getattr(config, "MAX_SEEN_ACCESSIONS", 5000)
-    to_save = list(seen)
-    if len(to_save) > cap:
-        to_save = to_save[-cap:]
+    while len(seen) > cap:
+        seen.popitem(last=False)
+
+
+# (size, newest key) of the classify cache as last loaded/saved; STATE_FILE is only rewritten when it changes.
+# The annotation is evaluated at import unless deferred, so this line needs the __future__ import on Python 3.9.
+_saved_cache_signature: tuple[int, str | None] = (0, None)
+
+
+def _cache_signature(cache: dict[str, list]) -> tuple[int, str | None]:
+    # Entries are only ever appended (and the oldest evicted), so size + newest key identify the contents.
+    return len(cache), next(reversed(cache), None)
+
+
+def load_classify_cache() -> dict[str, list]:
+    """Cached [event_type, confidence, evidence_snippets] per document hash (see _classify_key)."""
+    global _saved_cache_signature
+    cache = _load_state().get("classify_cache", {})
+    cache = cache if isinstance(cache, dict) else {}
+    _saved_cache_signature = _cache_signature(cache)
+    return cache
+
+
+def save_seen_accessions(
+    seen: OrderedDict[str, None],
+    new_accessions: list[str],
+    classify_cache: dict[str, list] | None = None,
+) -> None:
+    """
+    Append new_accessions to SEEN_LOG_FILE, so a poll writes O(new) bytes rather than the whole set.
+    The log is rewritten from seen (already capped) once it holds more than twice as many lines,
+    and written in full when it does not exist yet. classify_cache, if given, goes to STATE_FILE.
+    """
+    global _seen_log_lines, _saved_cache_signature
+    log_path = Path(getattr(config, "SEEN_LOG_FILE", "bot_seen.txt"))
     try:
-        with open(state_path, "w") as f:
-            json.dump({"seen_accessions": to_save}, f, indent=2)
+        if not log_path.exists() or _seen_log_lines + len(new_accessions) > 2 * len(seen):
+            tmp_path = log_path.with_name(log_path.name + ".tmp")
+            tmp_path.write_text("".join(acc + "\n" for acc in seen))
+            os.replace(tmp_path, log_path)
+            _seen_log_lines = len(seen)
+        elif new_accessions:
+            with open(log_path, "a") as f:
+                f.write("".join(acc + "\n" for acc in new_accessions))
+            _seen_log_lines += len(new_accessions)
+    except Exception as e:
+        log.warning("Could not save seen accessions: %s", e)
+
+    if not classify_cache:
+        return
+    # Dicts keep insertion order: drop the oldest entries first.
+    cache_cap = getattr(config, "MAX_CLASSIFY_CACHE", 1000)
+    while len(classify_cache) > cache_cap:
+        del classify_cache[next(iter(classify_cache))]
+    signature = _cache_signature(classify_cache)
+    if signature == _saved_cache_signature:
+        return  # nothing classified this poll; skip re-encoding the whole cache
+    try:
+        # Compact: the file is machine-read only, and indent=2 roughly doubled its size.
+        Path(config.STATE_FILE).write_text(
+            json.dumps({"classify_cache": classify_cache}, separators=(",", ":"))
+        )
+        _saved_cache_signature = signature
     except Exception as e:
         log.warning("Could not save state: %s", e)
 
 
+def _classify_key(text: str) -> str:
+    """Content hash of extracted document text (plus the rules version) for the classify cache."""
+    h = hashlib.blake2b(_RULES_FINGERPRINT, digest_size=16)
+    h.update(text.encode("utf-8", errors="ignore"))
+    return h.hexdigest()
+
+
 def _group_by_cik_form_date(filings: list[dict]) -> list[list[dict]]:
     """Group filings by (cik, form_type, filing_date). Return list of groups, each group a list of filing dicts."""
-    from collections import defaultdict
     groups_map: dict[tuple[str, str, str], list[dict]] = defaultdict(list)
     for f in filings:
         key = (f.get("cik") or "", f.get("form_type") or "", f.get("filing_date") or "")
@@ -65,14 +165,72 @@ def _group_by_cik_form_date(filings: list[dict]) -> list[list[dict]]:
     return [groups_map[k] for k in sorted_keys]
 
 
-def run_once(seen: set[str]) -> set[str]:
-    """Fetch filings, send alerts for new ones, return updated set of seen accession numbers."""
+def _classify_filing(
+    f: dict, sec_client: SecHttpClient, classify_cache: dict[str, list] | None
+) -> dict:
+    """Fetch the filing's primary doc and set event_type, confidence, evidence_snippets on f. Returns f."""
+    # Forms whose code already implies the event skip the fetch and classification entirely.
+    preset = getattr(config, "FORM_TO_EVENT", {}).get(f.get("form_type") or "")
+    if preset:
+        f["event_type"] = preset
+        f["confidence"] = 0.5
+        f["evidence_snippets"] = []
+        return f
+    url = f.get("primary_doc_url")
+    if url:
+        try:
+            content = sec_client.get(url)
+            text = extract_text(content, url)
+            key = _classify_key(text)
+            cached = classify_cache.get(key) if classify_cache is not None else None
+            if cached:
+                event_type, confidence, evidence = cached
+            else:
+                lower = text.lower()
+                event_type, confidence = classify_event(text, lower)
+                phrases = get_phrases_for_event(event_type)
+                evidence = extract_snippets(
+                    text, phrases, window_chars=250, max_snippets=3, max_snippet_len=200, lower=lower
+                )
+                if classify_cache is not None:
+                    classify_cache[key] = [event_type, confidence, evidence]
+            f["event_type"] = event_type
+            f["confidence"] = confidence
+            f["evidence_snippets"] = evidence
+            return f
+        except Exception as e:
+            log.warning("Fetch/classify failed for %s: %s", f.get("accession_number"), e)
+    f["event_type"] = "GENERIC_NEWS"
+    f["confidence"] = 0.2
+    f["evidence_snippets"] = []
+    return f
+
+
+def run_once(
+    seen: OrderedDict[str, None], classify_cache: dict[str, list] | None = None
+) -> list[str]:
+    """
+    Fetch filings, send alerts for new ones; seen is updated in place (oldest first).
+    Returns the accession numbers marked seen by this run, for save_seen_accessions.
+    classify_cache (document hash -> classification) is read and updated in place when given.
+    """
     log.info("Fetching filings for %s CIKs...", len(config.WATCHLIST_CIKS))
     filings = fetch_all_watchlist_filings()
     log.info("Got %s filings (after form filter).", len(filings))
 
-    # Filter to new accessions only.
-    new_filings = [f for f in filings if f.get("accession_number") and f["accession_number"] not in seen]
+    # Filter to new accessions only, once each: a filing with co-registrants is listed under every
+    # watchlist CIK involved, so the same accession can come back several times in one fetch.
+    fresh: dict[str, dict] = {}
+    for f in filings:
+        acc = f.get("accession_number")
+        if acc and acc not in seen:
+            fresh.setdefault(acc, f)
+    new_filings = list(fresh.values())
+    # Hard age cutoff before any primary-doc fetch, same rule as the fetcher (its 304 path returns
+    # cached filings without re-filtering them).
+    cutoff = filing_date_cutoff()
+    new_filings = [f for f in new_filings if not f.get("filing_date") or f["filing_date"] > cutoff]
+    marked: list[str] = []
 
     digest_mode = getattr(config, "ALERT_DIGEST_BY_GROUP", True)
     max_per_run = getattr(config, "MAX_NEW_ALERTS_PER_RUN", None)
@@ -82,12 +240,14 @@ def run_once(seen: set[str]) -> set[str]:
         groups = _group_by_cik_form_date(new_filings)
         if max_per_run is not None:
             groups = groups[:max_per_run]
-        for group in groups:
-            if send_digest_alert_sync(group):
+        # All groups go out in one batch (one event loop, one Telegram client).
+        for group, sent in zip(groups, send_digest_alerts_sync(groups)):
+            if sent:
                 for f in group:
                     acc = f.get("accession_number")
                     if acc:
-                        seen.add(acc)
+                        _mark_seen(seen, acc)
+                        marked.append(acc)
                 log.info(
                     "Digest sent: %s %s (%s filing(s))",
                     group[0].get("company_name"),
@@ -96,7 +256,7 @@ def run_once(seen: set[str]) -> set[str]:
                 )
             else:
                 log.warning("Failed to send digest for %s %s", group[0].get("company_name"), group[0].get("form_type"))
-        return seen
+        return marked
 
     # Non-digest: fetch primary doc, classify, send one alert per filing.
     if max_per_run is not None:
@@ -108,7 +268,7 @@ def run_once(seen: set[str]) -> set[str]:
         url = f0.get("primary_doc_url")
         if url:
             try:
-                client = SecHttpClient(config.SEC_USER_AGENT, min_interval_s=0.25)
+                client = SecHttpClient(config.SEC_USER_AGENT)
                 content = client.get(url)
                 text = extract_text(content, url)
                 preview = (text[:300] + "...") if len(text) > 300 else text
@@ -116,37 +276,28 @@ def run_once(seen: set[str]) -> set[str]:
             except Exception as e:
                 log.warning("Step 1 validation fetch failed: %s", e)
 
-    sec_client = SecHttpClient(config.SEC_USER_AGENT, min_interval_s=0.25)
+    sec_client = SecHttpClient(config.SEC_USER_AGENT)
+    to_alert: list[dict] = []
     for f in new_filings:
         acc = f.get("accession_number")
         if not acc:
             continue
-        seen.add(acc)
-        url = f.get("primary_doc_url")
-        if url:
-            try:
-                content = sec_client.get(url)
-                text = extract_text(content, url)
-                event_type, confidence = classify_event(text)
-                phrases = get_phrases_for_event(event_type)
-                evidence = extract_snippets(text, phrases, window_chars=250, max_snippets=3, max_snippet_len=200)
-                f["event_type"] = event_type
-                f["confidence"] = confidence
-                f["evidence_snippets"] = evidence
-            except Exception as e:
-                log.warning("Fetch/classify failed for %s: %s", acc, e)
-                f["event_type"] = "GENERIC_NEWS"
-                f["confidence"] = 0.2
-                f["evidence_snippets"] = []
-        else:
-            f["event_type"] = "GENERIC_NEWS"
-            f["confidence"] = 0.2
-            f["evidence_snippets"] = []
-        if send_filing_alert_sync(f):
+        _mark_seen(seen, acc)
+        marked.append(acc)
+        to_alert.append(f)
+
+    # Fetch + classify on a small thread pool so SEC round-trips overlap (requests still share the
+    # process-wide SEC rate limit); alerts then go out in one batch, in filing order.
+    # Sized for I/O: re holds the GIL while matching, so extra threads would not speed up classification.
+    workers = getattr(config, "SEC_DOC_FETCH_WORKERS", 4)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        classified = list(pool.map(lambda f: _classify_filing(f, sec_client, classify_cache), to_alert))
+    for f, sent in zip(classified, send_filing_alerts_sync(classified)):
+        if sent:
             log.info("Alert sent: %s %s", f.get("company_name"), f.get("form_type"))
         else:
-            log.warning("Failed to send Telegram alert for %s", acc)
-    return seen
+            log.warning("Failed to send Telegram alert for %s", f.get("accession_number"))
+    return marked
 
 
 def main() -> None:
@@ -156,20 +307,25 @@ def main() -> None:
         log.warning("Set SEC_USER_AGENT in .env (SEC requires a descriptive User-Agent).")
 
     seen = load_seen_accessions()
-    log.info("Loaded %s seen accession(s) from %s (duplicates will be skipped).", len(seen), config.STATE_FILE)
+    log.info(
+        "Loaded %s seen accession(s) from %s (duplicates will be skipped).",
+        len(seen),
+        getattr(config, "SEEN_LOG_FILE", "bot_seen.txt"),
+    )
+    classify_cache = load_classify_cache()
 
     # Run once and exit (e.g. for GitHub Actions). No loop, no sleep.
     if os.environ.get("RUN_ONCE") == "1":
-        seen = run_once(seen)
-        save_seen_accessions(seen)
+        new_accessions = run_once(seen, classify_cache)
+        save_seen_accessions(seen, new_accessions, classify_cache)
         return
 
     interval_sec = config.POLL_INTERVAL_MINUTES * 60
     log.info("Started. Polling every %s minutes. Ctrl+C to stop.", config.POLL_INTERVAL_MINUTES)
     while True:
         try:
-            seen = run_once(seen)
-            save_seen_accessions(seen)
+            new_accessions = run_once(seen, classify_cache)
+            save_seen_accessions(seen, new_accessions, classify_cache)
         except KeyboardInterrupt:
             log.info("Stopped by user.")
             break
@@ -12,24 +12,35 @@ from pathlib import Path
 RAW = Path(__file__).resolve().parent.parent / "watchlist_issuers_raw.txt"
 OUT = Path(__file__).resolve().parent.parent / "watchlist_issuers.txt"
 
+# Parenthetical suffixes: ($100), ($50), (was NYCB), (Exantas), (S50), (reset), etc.
+_PAREN_TAIL = re.compile(r"\s*\([^)]*\)\s*$")
+# Dash suffixes, e.g. "--$20/Issue". Applied after _PAREN_TAIL, not fused into one alternation:
+# for "Name -- x (a-b)" the fused pattern stops at the "-" inside the parens and leaves "Name -- x".
+_DASH_TAIL = re.compile(r"\s*--[^\-]+$")
+_WS = re.compile(r"\s+")
+
+
+def _strip_suffix(name: str) -> str:
+    """Strip the parenthetical / dash suffix and collapse whitespace."""
+    s = _PAREN_TAIL.sub("", (name or "").strip())
+    s = _DASH_TAIL.sub("", s)
+    return _WS.sub(" ", s).strip()
+
+
+def _strip(name: str) -> tuple[str, str]:
+    """(dedup key, canonical name) from one suffix-stripping pass."""
+    s = _strip_suffix(name)
+    return s.replace(".", "").lower(), s  # B. Riley = B Riley for dedup
+
 
 def normalize_for_key(name: str) -> str:
     """Normalize for dedup: strip parentheticals and extra space, lowercase for comparison."""
-    s = (name or "").strip()
-    # Remove parenthetical suffixes: ($100), ($50), (was NYCB), (Exantas), (S50), (reset), etc.
-    s = re.sub(r"\s*\([^)]*\)\s*$", "", s)
-    s = re.sub(r"\s*--[^\-]+$", "", s)  # e.g. "--$20/Issue"
-    s = re.sub(r"\s+", " ", s).strip()
-    s = s.replace(".", "")  # B. Riley = B Riley for dedup
-    return s.lower()
+    return _strip(name)[0]
 
 
 def canonical_name(name: str) -> str:
     """Prefer the version without parenthetical (shorter)."""
-    s = (name or "").strip()
-    s = re.sub(r"\s*\([^)]*\)\s*$", "", s)
-    s = re.sub(r"\s*--[^\-]+$", "", s)
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _strip(name)[1]
     # Title case for consistency (optional)
     return s if s else name.strip()
 
@@ -41,12 +52,12 @@ def main():
         line = line.strip()
         if not line:
             continue
-        key = normalize_for_key(line)
+        key, can = _strip(line)
         if not key:
             continue
         # Keep the first (or shortest) canonical name per key
-        can = canonical_name(line)
-        if key not in seen_keys or len(can) < len(seen_keys[key]):
+        cur = seen_keys.get(key)
+        if cur is None or len(can) < len(cur):
             seen_keys[key] = can
     unique = sorted(seen_keys.values(), key=lambda x: x.upper())
     OUT.write_text("\n".join(unique) + "\n")
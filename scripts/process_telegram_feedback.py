@@ -18,6 +18,7 @@ if str(_REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(_REPO_ROOT))
 
 import requests
+from requests.adapters import HTTPAdapter
 
 import config
 from event_classifier import (
@@ -31,6 +32,10 @@ log = logging.getLogger(__name__)
 
 TELEGRAM_BASE = "https://api.telegram.org/bot"
 
+# One keep-alive session for all Bot API calls in a run (one TLS handshake, not one per callback answer).
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
 
 def _load_offset(offset_path: Path) -> int:
     if not offset_path.exists():
@@ -46,20 +51,32 @@ def _save_offset(offset_path: Path, value: int) -> None:
 
 
 def _seen_update_ids(feedback_path: Path) -> set[int]:
+    """
+    update_ids already recorded in the feedback log. Streams the file line by line; rows written by
+    _append_feedback start with "update_id", so the int is sliced out without a full JSON parse.
+    """
     seen: set[int] = set()
     if not feedback_path.exists():
         return seen
-    for line in feedback_path.read_text().splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        try:
-            obj = json.loads(line)
-            uid = obj.get("update_id")
-            if uid is not None:
-                seen.add(int(uid))
-        except (json.JSONDecodeError, TypeError, ValueError):
-            continue
+    with open(feedback_path) as f:
+        for line in f:
+            i = line.find('"update_id"')
+            if i == -1:
+                continue
+            j = line.find(":", i)
+            k = line.find(",", j)
+            try:
+                seen.add(int(line[j + 1 : k if k != -1 else None].strip().rstrip("}")))
+                continue
+            except ValueError:
+                pass
+            # Unusual layout or a null id: fall back to parsing the whole row.
+            try:
+                uid = json.loads(line).get("update_id")
+                if uid is not None:
+                    seen.add(int(uid))
+            except (json.JSONDecodeError, AttributeError, TypeError, ValueError):
+                continue
     return seen
 
 
@@ -71,9 +88,9 @@ def _append_feedback(feedback_path: Path, row: dict) -> None:
 
 def _get_updates(token: str, offset: int, timeout: int = 5) -> list[dict]:
     url = f"{TELEGRAM_BASE}{token}/getUpdates"
-    r = requests.get(url, params={"offset": offset, "timeout": timeout}, timeout=timeout + 5)
+    r = _SESSION.get(url, params={"offset": offset, "timeout": timeout}, timeout=timeout + 5)
     r.raise_for_status()
-    data = r.json()
+    data = json.loads(r.content)  # Bot API responses are UTF-8 JSON; skip requests' charset detection
     if not data.get("ok"):
         return []
     return data.get("result", [])
@@ -84,7 +101,7 @@ def _answer_callback(token: str, callback_query_id: str, text: str | None = None
     payload = {"callback_query_id": callback_query_id}
     if text:
         payload["text"] = text[:200]
-    requests.post(url, json=payload, timeout=10)
+    _SESSION.post(url, json=payload, timeout=10)
 
 
 def _send_message(token: str, chat_id: str, text: str, reply_markup: dict | None = None) -> None:
@@ -92,19 +109,22 @@ def _send_message(token: str, chat_id: str, text: str, reply_markup: dict | None
     payload = {"chat_id": chat_id, "text": text}
     if reply_markup:
         payload["reply_markup"] = json.dumps(reply_markup)
-    requests.post(url, json=payload, timeout=10)
+    _SESSION.post(url, json=payload, timeout=10)
+
+
+# (label, event type) per button of the "Which event type?" keyboard, in ALL_EVENT_TYPES order.
+_BUTTON_TEMPLATES = [(event_type_display_name(ev), ev) for ev in ALL_EVENT_TYPES]
 
 
 def _build_event_type_keyboard(accession: str, suggested: str) -> dict:
     """Inline keyboard for 'Which event type?' - set:ACC:SUGGESTED:EVENT per button."""
+    prefix = f"set:{accession}:{suggested}:"
     row: list[dict] = []
     keyboard: list[list[dict]] = []
-    for ev in ALL_EVENT_TYPES:
-        label = event_type_display_name(ev)
-        cb = f"set:{accession}:{suggested}:{ev}"
-        if len(cb) > 64:
+    for label, ev in _BUTTON_TEMPLATES:
+        if len(prefix) + len(ev) > 64:  # Telegram's callback_data limit
             continue
-        row.append({"text": label, "callback_data": cb})
+        row.append({"text": label, "callback_data": prefix + ev})
         if len(row) >= 3:
             keyboard.append(row)
             row = []
@@ -126,6 +146,8 @@ def process_updates(
         return
     max_update_id = last_offset - 1
     new_rows: list[dict] = []
+    # One timestamp for the whole getUpdates batch.
+    now_iso = datetime.now(timezone.utc).isoformat()
     for upd in updates:
         uid = upd.get("update_id")
         if uid is not None:
@@ -145,7 +167,6 @@ def process_updates(
             continue
         parts = data_str.split(":", 3)
         prefix = parts[0] if parts else ""
-        now_iso = datetime.now(timezone.utc).isoformat()
         if prefix == "ok" and len(parts) >= 3:
             acc, suggested = parts[1], parts[2]
             row = {
@@ -1,11 +1,17 @@
 """
 Build EDGAR Archives URLs for primary documents and fetch document bytes.
-Throttles requests and retries on 429/5xx with exponential backoff.
+Rate-limits requests (shared SEC token bucket) and retries on 429/5xx with exponential backoff (urllib3 Retry).
 """
 
+import threading
 import time
+from functools import lru_cache
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from sec_ratelimit import SEC_BUCKET
 
 
 def accession_no_dashes(accession: str) -> str:
@@ -13,6 +19,7 @@ def accession_no_dashes(accession: str) -> str:
     return (accession or "").replace("-", "")
 
 
+@lru_cache(maxsize=2048)  # called per filing with the same few hundred watchlist CIKs
 def cik_to_int_str(cik: str) -> str:
     """Remove leading zeros and return CIK as string (e.g. '70858')."""
     try:
@@ -34,42 +41,44 @@ def build_primary_doc_url(cik: str, accession: str, primary_doc: str) -> str:
 class SecHttpClient:
     """
     HTTP client for SEC with throttle and retries.
-    - Throttle: min_interval_s between requests.
-    - Retries: on 429 or 5xx, exponential backoff, max 3 attempts total.
+    - Throttle: every request takes a token from SEC_BUCKET, the process-wide limit shared with
+      sec_fetcher; min_interval_s optionally spaces this client's requests further (shared across threads).
+    - Retries: urllib3 Retry on the session's adapter; on 429/5xx or connection errors, exponential
+      backoff (honoring SEC's Retry-After), max 3 attempts total.
     """
 
-    def __init__(self, user_agent: str, min_interval_s: float = 0.25) -> None:
+    def __init__(self, user_agent: str, min_interval_s: float = 0.0, pool_maxsize: int = 8) -> None:
         self._headers = {"User-Agent": user_agent}
         self._min_interval_s = min_interval_s
         self._last_request_time: float = 0.0
+        self._lock = threading.Lock()
+        retry = Retry(
+            total=2,
+            backoff_factor=1.0,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+            respect_retry_after_header=True,
+            raise_on_status=False,  # hand the last response to raise_for_status below
+        )
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(max_retries=retry, pool_maxsize=pool_maxsize))
 
     def _throttle(self) -> None:
-        elapsed = time.monotonic() - self._last_request_time
-        if elapsed < self._min_interval_s:
-            time.sleep(self._min_interval_s - elapsed)
-        self._last_request_time = time.monotonic()
+        if self._min_interval_s > 0:
+            # Held while sleeping so concurrent callers queue up and request starts stay spaced.
+            with self._lock:
+                elapsed = time.monotonic() - self._last_request_time
+                if elapsed < self._min_interval_s:
+                    time.sleep(self._min_interval_s - elapsed)
+                self._last_request_time = time.monotonic()
+        SEC_BUCKET.acquire()
 
     def get(self, url: str, timeout: int = 30) -> bytes:
         """
         GET url and return response body as bytes.
-        Throttles, then retries up to 3 times on 429 or 5xx with exponential backoff.
+        Throttles, then lets the session retry on 429 or 5xx; raises if the final response is an error.
         """
-        max_retries = 3
-        for attempt in range(max_retries):
-            self._throttle()
-            try:
-                r = requests.get(url, headers=self._headers, timeout=timeout)
-                if r.status_code == 429 or (500 <= r.status_code < 600):
-                    if attempt < max_retries - 1:
-                        delay = (2 ** attempt) * 1.0  # 1s, 2s, 4s
-                        time.sleep(delay)
-                        continue
-                r.raise_for_status()
-                return r.content
-            except requests.RequestException:
-                if attempt < max_retries - 1:
-                    delay = (2 ** attempt) * 1.0
-                    time.sleep(delay)
-                    continue
-                raise
-        return b""  # unreachable if we raise
+        self._throttle()
+        r = self._session.get(url, headers=self._headers, timeout=timeout)
+        r.raise_for_status()
+        return r.content
@@ -3,21 +3,57 @@ Fetch recent SEC filings for a list of issuers (CIKs) and form types.
 Uses the official SEC data.sec.gov submissions API.
 """
 
-import time
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import zip_longest
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
 
 import config
-from sec_archives import build_primary_doc_url
+from sec_archives import build_primary_doc_url, cik_to_int_str
+from sec_ratelimit import SEC_BUCKET
+
+try:
+    from orjson import loads as _json_loads  # optional; parses the submissions JSON about twice as fast
+except ImportError:
+    from json import loads as _json_loads
 
 
 SEC_BASE = "https://data.sec.gov/submissions"
 # SEC requires a descriptive User-Agent (company name + contact).
 REQUIRED_HEADERS = {"User-Agent": config.SEC_USER_AGENT}
 
+# One keep-alive session shared by the fetch workers (amortizes TLS handshakes to data.sec.gov).
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_connections=config.SEC_MAX_CONCURRENCY, pool_maxsize=config.SEC_MAX_CONCURRENCY),
+)
+
+
+# Frozen once at import, so a FORM_TYPES edited as a list/tuple still gets O(1) membership in the row filter.
+_FORM_TYPES = frozenset(config.FORM_TYPES)
+
 
+# Per-CIK validators and parsed filings from the last 200 response: cik -> (ETag, Last-Modified, filings).
+# Later polls send them as If-None-Match / If-Modified-Since; on 304 the cached filings are reused,
+# so unchanged issuers cost no body download or JSON parse. In-memory only (helps the polling loop).
+_CONDITIONAL: dict[str, tuple[str, str, list[dict[str, Any]]]] = {}
+
+
+def filing_date_cutoff() -> str:
+    """
+    MAX_FILING_AGE_DAYS cutoff as an ISO date (UTC); only filings dated strictly after it are recent.
+    Filings on the cutoff date are older than the cutoff (which carries a time of day), so they are dropped.
+    SEC dates are ISO YYYY-MM-DD, so callers compare with plain strings: filing_date > cutoff.
+    """
+    return (datetime.now(timezone.utc) - timedelta(days=config.MAX_FILING_AGE_DAYS)).date().isoformat()
+
+
+@lru_cache(maxsize=2048)
 def _normalize_cik(cik: str) -> str:
     """CIK as 10-digit zero-padded string for SEC URLs."""
     return str(cik).strip().zfill(10)
@@ -33,10 +69,22 @@ def fetch_filings_for_cik(cik: str) -> list[dict[str, Any]]:
     accession_number, form_type, filing_date, description, link, company_name.
     """
     url = _submissions_url(cik)
+    headers = REQUIRED_HEADERS
+    cached = _CONDITIONAL.get(cik)
+    if cached:
+        headers = dict(REQUIRED_HEADERS)
+        if cached[0]:
+            headers["If-None-Match"] = cached[0]
+        if cached[1]:
+            headers["If-Modified-Since"] = cached[1]
     try:
-        r = requests.get(url, headers=REQUIRED_HEADERS, timeout=30)
+        SEC_BUCKET.acquire()
+        r = _SESSION.get(url, headers=headers, timeout=30)
+        if r.status_code == 304 and cached:
+            # Unchanged: copies, since callers annotate the filing dicts in place.
+            return [dict(f) for f in cached[2]]
         r.raise_for_status()
-        data = r.json()
+        data = _json_loads(r.content)
     except Exception as e:
         return []  # skip this CIK on error; we'll log in main
 
@@ -60,30 +108,26 @@ def fetch_filings_for_cik(cik: str) -> list[dict[str, Any]]:
         no_dash = (acc or "").replace("-", "")
         return f"https://www.sec.gov/Archives/edgar/data/{cik_num}/{no_dash}/{acc}-index.htm"
 
-    try:
-        cutoff = datetime.utcnow() - timedelta(days=config.MAX_FILING_AGE_DAYS)
-    except Exception:
-        cutoff = None
+    cutoff = filing_date_cutoff()
+    form_types = _FORM_TYPES
+    # Filter on the form and date columns first; the other columns are only read for surviving rows.
+    keep = [
+        i
+        for i, (form, filing_date) in enumerate(zip_longest(forms, dates, fillvalue=""))
+        if form in form_types and (not filing_date or filing_date > cutoff)
+    ]
 
     # Dedupe by accession within this CIK so the same accession is not processed twice in one run.
     seen_acc = set()
     results = []
-    for i, form in enumerate(forms):
-        if form not in config.FORM_TYPES:
-            continue
+    for i in keep:
+        form = forms[i]
         acc = accessions[i] if i < len(accessions) else ""
         if acc and acc in seen_acc:
             continue
         if acc:
             seen_acc.add(acc)
         filing_date = dates[i] if i < len(dates) else ""
-        if cutoff and filing_date:
-            try:
-                fd = datetime.strptime(filing_date, "%Y-%m-%d")
-                if fd.replace(tzinfo=None) < cutoff:
-                    continue
-            except Exception:
-                pass
         desc = primary_desc[i] if i < len(primary_desc) else ""
         primary_doc_name = primary_doc[i] if i < len(primary_doc) else ""
         results.append({
@@ -95,25 +139,27 @@ def fetch_filings_for_cik(cik: str) -> list[dict[str, Any]]:
             "company_name": company_name,
             "primary_doc_url": build_primary_doc_url(cik, acc, primary_doc_name),
         })
+    etag = r.headers.get("ETag", "")
+    last_modified = r.headers.get("Last-Modified", "")
+    if etag or last_modified:
+        _CONDITIONAL[cik] = (etag, last_modified, [dict(f) for f in results])
     return results
 
 
 def fetch_all_watchlist_filings() -> list[dict[str, Any]]:
     """
     Fetch recent filings for all watchlist CIKs, filtered by FORM_TYPES.
-    Throttles requests to be nice to SEC (no more than 10/sec).
+    Up to SEC_MAX_CONCURRENCY requests are in flight; the shared SEC_BUCKET keeps the rate under 10/sec.
     """
+    ciks = list(config.WATCHLIST_CIKS)
     all_filings = []
-    for cik in config.WATCHLIST_CIKS:
-        filings = fetch_filings_for_cik(cik)
-        try:
-            cik_int_str = str(int(str(cik).strip()))
-        except (ValueError, TypeError):
-            cik_int_str = str(cik).strip().lstrip("0") or "0"
-        ticker = config.CIK_TO_TICKER.get(cik_int_str, "")
+    with ThreadPoolExecutor(max_workers=config.SEC_MAX_CONCURRENCY) as pool:
+        results = list(pool.map(fetch_filings_for_cik, ciks))
+    for cik, filings in zip(ciks, results):
+        cik10 = _normalize_cik(cik)
+        ticker = config.CIK_TO_TICKER.get(cik_to_int_str(cik), "")
         for f in filings:
-            f["cik"] = _normalize_cik(cik)
+            f["cik"] = cik10
             f["ticker"] = ticker
             all_filings.append(f)
-        time.sleep(0.2)  # throttle
     return all_filings
@@ -0,0 +1,37 @@
+"""
+Process-wide rate limit for SEC requests.
+SEC allows 10 requests/second per user across all traffic; every SEC-bound call acquires a token first.
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: bursts of up to `capacity` requests, refilled at `rate` tokens/second.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._last_refill) * self._rate)
+                self._last_refill = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self._rate
+            time.sleep(wait)
+
+
+# Shared by all SEC requests in the process. 9/s leaves headroom under SEC's 10/s.
+SEC_BUCKET = TokenBucket(rate=9.0)
@@ -2,24 +2,40 @@
 Send SEC filing alerts to Telegram.
 """
 
+from __future__ import annotations
+
 import asyncio
+import atexit
 import logging
+import random
 import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from html import escape as _html_escape
 from typing import Any
 
 import config
 from event_classifier import event_type_display_name, GENERIC_NEWS
 
+# Imported once here rather than per call. Without python-telegram-bot, alerts are skipped (sends return False).
+try:
+    from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup
+    from telegram.error import BadRequest, NetworkError, RetryAfter
+    from telegram.request import HTTPXRequest
+except ImportError:
+    Bot = InlineKeyboardButton = InlineKeyboardMarkup = None
+    BadRequest = NetworkError = RetryAfter = HTTPXRequest = None
+
 log = logging.getLogger(__name__)
 
 # Telegram message length limit (characters).
 TELEGRAM_MAX_MESSAGE_LENGTH = 4096
 
 
-def build_feedback_keyboard(filing: dict[str, Any]) -> "InlineKeyboardMarkup":
+def build_feedback_keyboard(filing: dict[str, Any]) -> "InlineKeyboardMarkup | None":
     """Build inline keyboard with Correct / Wrong / Not relevant for a single-filing alert."""
-    from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-
+    if InlineKeyboardMarkup is None:
+        return None
     accession = (filing.get("accession_number") or "").strip()
     suggested = (filing.get("event_type") or GENERIC_NEWS).strip()
     if not accession or not suggested:
@@ -62,7 +78,7 @@ def format_filing_alert(filing: dict[str, Any]) -> str:
     ]
     if evidence:
         for snip in evidence[:4]:
-            escaped = snip.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            escaped = _html_escape(snip, quote=False)
             lines.append(f"• {escaped}")
     if link:
         lines.append(link)
@@ -72,14 +88,8 @@ def format_filing_alert(filing: dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
-def format_digest_alert(filings: list[dict[str, Any]]) -> str:
-    """
-    One message per (cik, form_type, filing_date) group: title line plus bullet list.
-    Each bullet shows SEC description when present, then link.
-    filings: list of filing dicts with same company_name, form_type, filing_date; each has link, description, accession_number.
-    """
-    if not filings:
-        return ""
+def _digest_lines(filings: list[dict[str, Any]]) -> list[str]:
+    """Title line plus one bullet per filing; shared by format_digest_alert and send_digest_alert."""
     first = filings[0]
     company = (first.get("company_name") or "").strip() or "—"
     form = first.get("form_type") or ""
@@ -91,32 +101,126 @@ def format_digest_alert(filings: list[dict[str, Any]]) -> str:
         link = f.get("link") or ""
         desc = (f.get("description") or "").strip()
         if desc:
-            escaped = desc.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            escaped = _html_escape(desc, quote=False)
             line = f"• {escaped}"
             if link:
                 line += f" — {link}"
             lines.append(line)
         elif link:
             lines.append(f"• {link}")
-    return "\n".join(lines)
+    return lines
+
+
+def format_digest_alert(filings: list[dict[str, Any]]) -> str:
+    """
+    One message per (cik, form_type, filing_date) group: title line plus bullet list.
+    Each bullet shows SEC description when present, then link.
+    filings: list of filing dicts with same company_name, form_type, filing_date; each has link, description, accession_number.
+    """
+    if not filings:
+        return ""
+    return "\n".join(_digest_lines(filings))
+
 
+# Attempts per message (first try + retries) on 429 / network errors.
+_TELEGRAM_MAX_ATTEMPTS = 6
+# Cap for the exponential network-error backoff, in seconds.
+_TELEGRAM_MAX_BACKOFF = 60
 
-# Backoff seconds when Telegram returns 429 (up to 3 retries).
-_TELEGRAM_429_BACKOFF = [30, 60, 90]
 
+def _retry_after_seconds(e: Any) -> float:
+    """RetryAfter.retry_after is int seconds, or a timedelta on newer python-telegram-bot releases."""
+    value = e.retry_after
+    return value.total_seconds() if isinstance(value, timedelta) else float(value)
 
-def _is_429(e: BaseException) -> bool:
-    s = str(e).lower()
-    return "429" in s or "too many requests" in s or "retry after" in s
 
+# One Bot (and so one HTTP connection pool) per process. Its HTTP client is bound to the event loop it was
+# initialized on, so the sync wrappers below all run on one long-lived loop (_run) rather than asyncio.run.
+_LOOP: asyncio.AbstractEventLoop | None = None
+_BOT: Any = None
+_BOT_LOOP: asyncio.AbstractEventLoop | None = None
+# Serializes first-use initialization when several sends start at once.
+_BOT_LOCK = asyncio.Lock()
 
-async def _send_message(text: str, reply_markup: Any = None) -> bool:
-    """Send one message to the configured chat. Retries on 429 with backoff. Returns True on success."""
-    if not config.TELEGRAM_BOT_TOKEN or not config.TELEGRAM_CHAT_ID:
+
+async def _get_bot() -> Any:
+    """The shared telegram.Bot, created and initialized on first use (again if called from another loop)."""
+    global _BOT, _BOT_LOOP
+    loop = asyncio.get_running_loop()
+    if _BOT is not None and _BOT_LOOP is loop:
+        return _BOT
+    async with _BOT_LOCK:
+        if _BOT is None or _BOT_LOOP is not loop:
+            old_bot, old_loop = _BOT, _BOT_LOOP
+            # Explicit pool limits: older python-telegram-bot releases default to a single pooled connection
+            # and a 1 s pool timeout ("All connections in the connection pool are occupied").
+            request = HTTPXRequest(connection_pool_size=8, pool_timeout=10.0)
+            bot = Bot(token=config.TELEGRAM_BOT_TOKEN, request=request)
+            await bot.initialize()
+            _BOT, _BOT_LOOP = bot, loop
+            if old_bot is not None:
+                await _close_bot(old_bot, old_loop)
+    return _BOT
+
+
+async def _close_bot(bot: Any, loop: asyncio.AbstractEventLoop) -> None:
+    """
+    Shut down a replaced Bot's HTTP client on the loop it was initialized on (its connections belong to it).
+    A loop running on another thread gets the shutdown scheduled without waiting (it may be blocked in _run
+    on this very call), so it only completes if that loop keeps running; an idle one is driven from a worker
+    thread; a closed one took its connections with it.
+    """
+    if loop.is_closed():
+        return
+    try:
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(bot.shutdown(), loop)
+        else:
+            await asyncio.get_running_loop().run_in_executor(None, loop.run_until_complete, bot.shutdown())
+    except Exception as e:
+        log.debug("Telegram bot shutdown failed: %s", e)
+
+
+def _run(coro: Any) -> Any:
+    """
+    Run coro to completion on the module's event loop (created on first use).
+    From inside a running event loop, where this thread cannot drive a second loop, the module loop is
+    run on a helper thread instead; the call still blocks, so async callers should await the async API.
+    """
+    global _LOOP
+    if _LOOP is None or _LOOP.is_closed():
+        _LOOP = asyncio.new_event_loop()
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return _LOOP.run_until_complete(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(_LOOP.run_until_complete, coro).result()
+
+
+def _shutdown() -> None:
+    """Close the shared Bot's HTTP client (on its own loop, if still open) and the module loop at interpreter exit."""
+    if _BOT is not None and _BOT_LOOP is not None and not _BOT_LOOP.is_closed() and not _BOT_LOOP.is_running():
+        try:
+            _BOT_LOOP.run_until_complete(_BOT.shutdown())
+        except Exception as e:
+            log.debug("Telegram bot shutdown failed: %s", e)
+    if _LOOP is not None and not _LOOP.is_closed():
+        _LOOP.close()
+
+
+atexit.register(_shutdown)
+
+
+async def _send_message(text: str, reply_markup: Any = None, bot: Any = None) -> bool:
+    """
+    Send one message to the configured chat. Retries on 429 with backoff. Returns True on success.
+    bot: the telegram.Bot to use; defaults to the shared one (_get_bot).
+    """
+    if not config.TELEGRAM_BOT_TOKEN or not config.TELEGRAM_CHAT_ID or Bot is None:
         return False
-    from telegram import Bot
-    bot = Bot(token=config.TELEGRAM_BOT_TOKEN)
-    last_exc = None
+    if bot is None:
+        bot = await _get_bot()
     kwargs = dict(
         chat_id=config.TELEGRAM_CHAT_ID,
         text=text,
@@ -125,74 +229,157 @@ async def _send_message(text: str, reply_markup: Any = None) -> bool:
     )
     if reply_markup is not None:
         kwargs["reply_markup"] = reply_markup
-    for attempt in range(1 + len(_TELEGRAM_429_BACKOFF)):
+    last = _TELEGRAM_MAX_ATTEMPTS - 1
+    for attempt in range(_TELEGRAM_MAX_ATTEMPTS):
         try:
             await bot.send_message(**kwargs)
             return True
-        except Exception as e:
-            last_exc = e
-            if attempt < len(_TELEGRAM_429_BACKOFF) and _is_429(e):
-                wait = _TELEGRAM_429_BACKOFF[attempt]
-                log.warning("Telegram 429, retrying in %s s (attempt %s)", wait, attempt + 1)
-                await asyncio.sleep(wait)
-            else:
+        except RetryAfter as e:
+            if attempt == last:
+                raise
+            # 429: wait what Telegram asks for; the jitter keeps retries from landing together.
+            wait = _retry_after_seconds(e) + random.uniform(0, 0.5)
+            log.warning("Telegram 429, retrying in %.1f s (attempt %s)", wait, attempt + 1)
+        except BadRequest:
+            raise  # a NetworkError subclass, but retrying the same request cannot fix it
+        except NetworkError as e:
+            if attempt == last:
                 raise
-    if last_exc:
-        raise last_exc
+            # Includes TimedOut.
+            wait = min(_TELEGRAM_MAX_BACKOFF, 2**attempt) + random.uniform(0, 1)
+            log.warning("Telegram network error (%s), retrying in %.1f s (attempt %s)", e, wait, attempt + 1)
+        await asyncio.sleep(wait)
     return False
 
 
-async def send_filing_alert(filing: dict[str, Any]) -> bool:
+async def send_filing_alert(filing: dict[str, Any], bot: Any = None) -> bool:
     """Send a single filing alert with Correct / Wrong / Not relevant buttons. Returns True on success."""
     text = format_filing_alert(filing)
     keyboard = build_feedback_keyboard(filing)
-    return await _send_message(text, reply_markup=keyboard)
+    return await _send_message(text, reply_markup=keyboard, bot=bot)
 
 
-async def send_digest_alert(filings: list[dict[str, Any]]) -> bool:
+async def send_digest_alert(filings: list[dict[str, Any]], bot: Any = None) -> bool:
     """Send one or more digest messages for a group of filings. Splits if over Telegram's 4096-char limit."""
     if not filings:
         return True
-    text = format_digest_alert(filings)
+    return await _send_digest_lines(_digest_lines(filings), bot=bot)
+
+
+async def _send_digest_lines(lines: list[str], bot: Any = None) -> bool:
+    """Send a digest given its lines (see _digest_lines), split over several messages if too long."""
+    if not lines:
+        return True
+    text = "\n".join(lines)
     if len(text) <= TELEGRAM_MAX_MESSAGE_LENGTH:
-        return await _send_message(text)
-    # Split into chunks: build lines and send in batches under the limit.
-    first = filings[0]
-    company = (first.get("company_name") or "").strip() or "—"
-    form = first.get("form_type") or ""
-    date = first.get("filing_date") or ""
-    n = len(filings)
-    title = f"<b>{company} — {form} · {date}</b> ({n} filing{'s' if n != 1 else ''})"
-    lines = [title]
-    for f in filings:
-        link = f.get("link") or ""
-        desc = (f.get("description") or "").strip()
-        if desc:
-            escaped = desc.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-            line = f"• {escaped}"
-            if link:
-                line += f" — {link}"
-            lines.append(line)
-        elif link:
-            lines.append(f"• {link}")
+        return await _send_message(text, bot=bot)
+    # Split into chunks: send the lines in batches under the limit.
     max_line = TELEGRAM_MAX_MESSAGE_LENGTH - 20  # leave room for "(continued)" etc.
+    continued = "<i>(continued)</i>"
     chunk: list[str] = []
+    chunk_len = 0  # len("\n".join(chunk)), kept as a running total instead of re-joining per line
     for line in lines:
         if len(line) > max_line:
             line = line[: max_line - 1] + "…"
-        trial = chunk + [line]
-        trial_text = "\n".join(trial)
-        if chunk and len(trial_text) > TELEGRAM_MAX_MESSAGE_LENGTH:
-            if await _send_message("\n".join(chunk)) is False:
+        if chunk and chunk_len + 1 + len(line) > TELEGRAM_MAX_MESSAGE_LENGTH:
+            if await _send_message("\n".join(chunk), bot=bot) is False:
                 return False
-            chunk = ["<i>(continued)</i>", line]
+            chunk = [continued, line]
+            chunk_len = len(continued) + 1 + len(line)
         else:
-            chunk = trial
+            chunk_len += len(line) + 1 if chunk else len(line)
+            chunk.append(line)
     if chunk:
-        return await _send_message("\n".join(chunk))
+        return await _send_message("\n".join(chunk), bot=bot)
     return True
 
 
+async def _send_many(send: Any, items: list[Any]) -> list[bool]:
+    """
+    Run send(item, bot) for each item, in order, over the shared Bot (one HTTP client / TLS session).
+    Sends stay sequential, TELEGRAM_SEND_DELAY_SEC apart: Telegram allows about one message per
+    second per chat, so concurrent sends to the single alert chat would only collect 429s.
+    A failed send is logged and reported as False; the remaining items are still sent.
+    """
+    if not items:
+        return []
+    if not config.TELEGRAM_BOT_TOKEN or not config.TELEGRAM_CHAT_ID or Bot is None:
+        return [False] * len(items)
+
+    delay = getattr(config, "TELEGRAM_SEND_DELAY_SEC", 0) or 0
+    bot = await _get_bot()
+    results: list[bool] = []
+    for i, item in enumerate(items):
+        if i and delay > 0:
+            await asyncio.sleep(delay)
+        try:
+            results.append(await send(item, bot))
+        except Exception as e:
+            log.warning("Telegram send failed: %s", e)
+            results.append(False)
+    return results
+
+
+async def send_filing_alerts(filings: list[dict[str, Any]]) -> list[bool]:
+    """Send one alert per filing over a shared Bot. Returns success per filing, in order."""
+    return await _send_many(send_filing_alert, filings)
+
+
+def _coalesce_digests(groups: list[list[dict[str, Any]]]) -> list[tuple[list[int], list[list[str]]]]:
+    """
+    Pack consecutive groups into batches whose digests, joined by a blank line, fit in one Telegram message.
+    Returns (group indices, digest lines per group) per batch, so the digests are formatted only once.
+    A digest too long on its own gets a batch to itself (_send_digest_lines splits it).
+    """
+    batches: list[tuple[list[int], list[list[str]]]] = []
+    batch: list[int] = []
+    digests: list[list[str]] = []
+    batch_len = 0
+    for i, group in enumerate(groups):
+        lines = _digest_lines(group) if group else []
+        n = sum(map(len, lines)) + len(lines) - 1 if lines else 0  # len("\n".join(lines))
+        if n > TELEGRAM_MAX_MESSAGE_LENGTH:
+            if batch:
+                batches.append((batch, digests))
+                batch, digests, batch_len = [], [], 0
+            batches.append(([i], [lines]))
+            continue
+        add = n + 2 if batch else n
+        if batch and batch_len + add > TELEGRAM_MAX_MESSAGE_LENGTH:
+            batches.append((batch, digests))
+            batch, digests, add = [], [], n
+            batch_len = 0
+        batch.append(i)
+        digests.append(lines)
+        batch_len += add
+    if batch:
+        batches.append((batch, digests))
+    return batches
+
+
+async def _send_digest_batch(digests: list[list[str]], bot: Any = None) -> bool:
+    """Send several digests (as lines, see _coalesce_digests) as one message."""
+    if len(digests) == 1:
+        return await _send_digest_lines(digests[0], bot=bot)
+    return await _send_message("\n\n".join("\n".join(lines) for lines in digests), bot=bot)
+
+
+async def send_digest_alerts(groups: list[list[dict[str, Any]]]) -> list[bool]:
+    """
+    Send the digests for groups of filings over a shared Bot. Returns success per group, in order.
+    With ALERT_DIGEST_COALESCE, consecutive digests share a message while they fit in the length limit.
+    """
+    if not getattr(config, "ALERT_DIGEST_COALESCE", True):
+        return await _send_many(send_digest_alert, groups)
+    batches = _coalesce_digests(groups)
+    sent = await _send_many(_send_digest_batch, [digests for _, digests in batches])
+    results = [False] * len(groups)
+    for (batch, _), ok in zip(batches, sent):
+        for i in batch:
+            results[i] = ok
+    return results
+
+
 def _apply_delay() -> None:
     delay = getattr(config, "TELEGRAM_SEND_DELAY_SEC", 0) or 0
     if delay > 0:
@@ -202,10 +389,20 @@ def _apply_delay() -> None:
 def send_filing_alert_sync(filing: dict[str, Any]) -> bool:
     """Synchronous wrapper for send_filing_alert. Applies configured delay before send."""
     _apply_delay()
-    return asyncio.run(send_filing_alert(filing))
+    return _run(send_filing_alert(filing))
 
 
 def send_digest_alert_sync(filings: list[dict[str, Any]]) -> bool:
     """Synchronous wrapper for send_digest_alert. Applies configured delay before send."""
     _apply_delay()
-    return asyncio.run(send_digest_alert(filings))
+    return _run(send_digest_alert(filings))
+
+
+def send_filing_alerts_sync(filings: list[dict[str, Any]]) -> list[bool]:
+    """Synchronous wrapper for send_filing_alerts (shared event loop and Bot)."""
+    return _run(send_filing_alerts(filings))
+
+
+def send_digest_alerts_sync(groups: list[list[dict[str, Any]]]) -> list[bool]:
+    """Synchronous wrapper for send_digest_alerts (shared event loop and Bot)."""
+    return _run(send_digest_alerts(groups))
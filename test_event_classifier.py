@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Check event_classifier's fast paths against plain re.search.
+Usage: python3 test_event_classifier.py  (or pytest)
+"""
+import re
+
+from event_classifier import _chain_segments, _literal_anchors, _search_chain
+
+PATTERNS = [
+    r"\bwill redeem\b.*\ba portion of\b",
+    r"\bwill redeem\b.*?\ba portion of\b",
+    r"foo[.*]bar",
+    r"foo[.*]bar.*\bbaz\b",
+    r"foo[a.*z]",
+    r"(?:\bcall\b.*\bnotes\b)?\bredeem\b",
+    r"\bnet income\b.*\bquarter\b.*\bresults\b",
+    r"(?:foo.*bar)|baz",
+]
+
+TEXTS = [
+    "",
+    "The Company will redeem a portion of its notes.",
+    "will redeem\na portion of",
+    "WILL REDEEM all notes; a portion of the proceeds",
+    "foo.bar",
+    "foo*bar then baz",
+    "foobar baz",
+    "foo]bar",
+    "net income for the quarter results",
+    "net income results quarter",
+    "baz",
+    "fooa",
+    "we will redeem",
+]
+
+
+def _search(pat: str, text: str) -> bool:
+    """What event_classifier does for one pattern: anchor prefilter, then the chain or the full regex."""
+    lower = text.lower()
+    if not all(a in lower for a in _literal_anchors(pat)):
+        return False
+    chain = _chain_segments(pat)
+    if chain is not None:
+        return _search_chain(text, chain)
+    return re.search(pat, text, re.IGNORECASE) is not None
+
+
+def test_fast_paths_match_re_search():
+    for pat in PATTERNS:
+        for text in TEXTS:
+            expected = re.search(pat, text, re.IGNORECASE) is not None
+            assert _search(pat, text) == expected, (pat, text)
+
+
+def test_quantified_dot_star_is_not_chained():
+    assert _chain_segments(r"\bwill redeem\b.*?\ba portion of\b") is None
+    assert _chain_segments(r"\bwill redeem\b.*\ba portion of\b") is not None
+
+
+def test_anchors_ignore_dot_star_inside_classes_and_groups():
+    assert _literal_anchors(r"foo[a.*z]") == ("foo",)
+    assert _literal_anchors(r"(?:\bcall\b.*\bnotes\b)?\bredeem\b") == ()
+
+
+if __name__ == "__main__":
+    test_fast_paths_match_re_search()
+    test_quantified_dot_star_is_not_chained()
+    test_anchors_ignore_dot_star_inside_classes_and_groups()
+    print("OK")
@@ -2,7 +2,9 @@
 Extract plain text from SEC document bytes (HTML or TXT).
 """
 
+import functools
 import warnings
+from typing import Iterator
 
 # SEC documents are often XBRL/XML; suppress "parsed as HTML" warning for clean logs.
 try:
@@ -11,9 +13,13 @@ try:
 except ImportError:
     pass
 
+# Elements whose text is not document content (BeautifulSoup's get_text skips them too).
+_SKIP_TAGS = frozenset({"script", "style", "template"})
 
+
+@functools.cache
 def _parser() -> str:
-    """Use lxml if available, else html.parser."""
+    """Use lxml if available, else html.parser (probed once per process)."""
     try:
         import lxml  # noqa: F401
         return "lxml"
@@ -21,23 +27,91 @@ def _parser() -> str:
         return "html.parser"
 
 
+def _is_html(url: str) -> bool:
+    url_lower = (url or "").lower()
+    return url_lower.endswith(".htm") or url_lower.endswith(".html")
+
+
+def _decode(content: bytes) -> str:
+    """Decode HTML bytes: UTF-8 if valid, else Windows-1252 (what older EDGAR HTML mostly is)."""
+    try:
+        return content.decode("utf-8")
+    except UnicodeDecodeError:
+        return content.decode("cp1252", errors="ignore")
+
+
+class _TextTarget:
+    """
+    SAX-style lxml parser target: collects text in document order without building a tree.
+    Tag boundaries become " " (like get_text(separator=" ")); script/style text is dropped.
+    """
+
+    def __init__(self) -> None:
+        self.parts: list[str] = []
+        self._skip_depth = 0
+
+    def start(self, tag: str, attrib: dict) -> None:
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        self.parts.append(" ")
+
+    def end(self, tag: str) -> None:
+        if tag in _SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        self.parts.append(" ")
+
+    def data(self, data: str) -> None:
+        if not self._skip_depth:
+            self.parts.append(data)
+
+    def comment(self, text: str) -> None:
+        self.parts.append(" ")
+
+    def close(self) -> None:
+        return None
+
+
+def extract_text_iter(content: bytes, url: str, chunk_chars: int = 1 << 16) -> Iterator[str]:
+    """
+    Yield the document's text in order, piece by piece (not whitespace-normalized).
+    - HTML (.htm/.html): fed to lxml's parser chunk_chars at a time with a streaming target,
+      so no parse tree is built; falls back to BeautifulSoup when lxml is not installed.
+    - Else: the content decoded as utf-8 with errors="ignore".
+    """
+    if not content:
+        return
+    if not _is_html(url):
+        yield content.decode("utf-8", errors="ignore")
+        return
+    # Decoded once here: lxml gets str chunks, and BeautifulSoup given str skips its charset detection.
+    html = _decode(content)
+    try:
+        from lxml import etree
+    except ImportError:
+        from bs4 import BeautifulSoup
+        yield BeautifulSoup(html, _parser()).get_text(separator=" ")
+        return
+    target = _TextTarget()
+    parser = etree.HTMLParser(target=target)
+    for i in range(0, len(html), chunk_chars):
+        parser.feed(html[i : i + chunk_chars])
+        yield from target.parts
+        target.parts.clear()
+    parser.close()
+    yield from target.parts
+
+
 def extract_text(content: bytes, url: str) -> str:
     """
     Extract plain text from document bytes.
-    - If url ends with .htm or .html: parse with BeautifulSoup, get_text(separator=" ").
+    - If url ends with .htm or .html: stream-parse and collect text (see extract_text_iter).
     - Else: decode as utf-8 with errors="ignore".
     - Normalize whitespace: single spaces, no leading/trailing.
     """
     if not content:
         return ""
-    url_lower = (url or "").lower()
-    if url_lower.endswith(".htm") or url_lower.endswith(".html"):
-        try:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(content, _parser())
-            text = soup.get_text(separator=" ")
-        except Exception:
-            text = content.decode("utf-8", errors="ignore")
-    else:
+    try:
+        text = "".join(extract_text_iter(content, url))
+    except Exception:
         text = content.decode("utf-8", errors="ignore")
     return " ".join(text.split())
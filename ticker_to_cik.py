@@ -2,17 +2,27 @@
 Resolve ticker symbols to SEC CIKs using the SEC's company_tickers.json.
 Watchlist = preferreds (watchlist_preferred_tickers.txt) + CEFs (watchlist_cef_tickers.txt).
 """
+import functools
 import logging
 import os
 from pathlib import Path
 
 import requests
 
+# Use orjson when installed (company_tickers.json is ~1 MB); fall back to the stdlib parser.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
 LOG = logging.getLogger(__name__)
 
 SEC_TICKERS_URL = "https://www.sec.gov/files/company_tickers.json"
 WATCHLIST_PREFERRED_TICKERS_FILE = Path(__file__).resolve().parent / "watchlist_preferred_tickers.txt"
 WATCHLIST_CEF_TICKERS_FILE = Path(__file__).resolve().parent / "watchlist_cef_tickers.txt"
+# Last downloaded company_tickers.json, plus its ETag / Last-Modified (one per line) for conditional requests.
+SEC_TICKERS_CACHE_FILE = Path(__file__).resolve().parent / "company_tickers.json"
+SEC_TICKERS_VALIDATORS_FILE = SEC_TICKERS_CACHE_FILE.with_name(SEC_TICKERS_CACHE_FILE.name + ".etag")
 
 
 def _sec_user_agent() -> str:
@@ -20,22 +30,55 @@ def _sec_user_agent() -> str:
     return os.getenv("SEC_USER_AGENT", "BAMSecFilingBot your@email.com")
 
 
-def load_sec_ticker_map() -> dict[str, str]:
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write data to a temp file next to path, then swap it in, so path is never left half-written."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _fetch_company_tickers() -> bytes:
     """
-    Fetch SEC company_tickers.json and return a map ticker_upper -> cik (string).
+    Body of company_tickers.json, revalidating the on-disk copy with If-None-Match / If-Modified-Since.
+    On 304 (or if the SEC cannot be reached) the cached file is used; otherwise the new body is cached.
     """
+    headers = {"User-Agent": _sec_user_agent()}
+    cached = SEC_TICKERS_CACHE_FILE.exists()
+    if cached and SEC_TICKERS_VALIDATORS_FILE.exists():
+        try:
+            etag, last_modified = (SEC_TICKERS_VALIDATORS_FILE.read_text().splitlines() + ["", ""])[:2]
+        except OSError:
+            etag = last_modified = ""
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
     try:
-        r = requests.get(
-            SEC_TICKERS_URL,
-            headers={"User-Agent": _sec_user_agent()},
-            timeout=30,
-        )
+        r = requests.get(SEC_TICKERS_URL, headers=headers, timeout=30)
+        if r.status_code == 304 and cached:
+            return SEC_TICKERS_CACHE_FILE.read_bytes()
         r.raise_for_status()
-        data = r.json()
     except Exception as e:
-        LOG.warning("Could not load SEC company tickers: %s", e)
-        return {}
-
+        if not cached:
+            raise
+        LOG.warning("Could not refresh SEC company tickers (%s); using cached copy.", e)
+        return SEC_TICKERS_CACHE_FILE.read_bytes()
+    # Validators go first and come back last, so a crash in between leaves no ETag to revalidate a body
+    # it does not belong to (the next run then just downloads again). Each file is replaced atomically.
+    try:
+        SEC_TICKERS_VALIDATORS_FILE.unlink(missing_ok=True)
+        _write_atomic(SEC_TICKERS_CACHE_FILE, r.content)
+        validators = f"{r.headers.get('ETag', '')}\n{r.headers.get('Last-Modified', '')}\n"
+        _write_atomic(SEC_TICKERS_VALIDATORS_FILE, validators.encode())
+    except OSError as e:
+        LOG.debug("Could not cache SEC company tickers: %s", e)
+    return r.content
+
+
+@functools.cache
+def _sec_ticker_map() -> dict[str, str]:
+    """Parsed ticker map, memoized for the process. Raises on failure, so failures are not cached."""
+    data = _json_loads(_fetch_company_tickers())
     # data is {"0": {"cik_str": 320193, "ticker": "AAPL", "title": "..."}, ...}
     out = {}
     for entry in data.values():
@@ -46,6 +89,22 @@ def load_sec_ticker_map() -> dict[str, str]:
     return out
 
 
+def load_sec_ticker_map() -> dict[str, str]:
+    """
+    Fetch SEC company_tickers.json (cached on disk, see _fetch_company_tickers) and return a map
+    ticker_upper -> cik (string). Loaded once per process; callers must not mutate the result.
+    load_sec_ticker_map.cache_clear() drops the memoized map so the next call fetches again.
+    """
+    try:
+        return _sec_ticker_map()
+    except Exception as e:
+        LOG.warning("Could not load SEC company tickers: %s", e)
+        return {}
+
+
+load_sec_ticker_map.cache_clear = _sec_ticker_map.cache_clear
+
+
 def _load_tickers_from_file(path: Path) -> set[str]:
     """Load ticker symbols from a file (one per line, uppercase)."""
     if not path.exists():
@@ -54,16 +113,20 @@ def _load_tickers_from_file(path: Path) -> set[str]:
     return {t.strip().upper() for t in raw.splitlines() if t.strip()}
 
 
+# The ticker loaders below are memoized: get_watchlist_ciks and get_cik_to_ticker both need them at startup.
+@functools.cache
 def load_preferred_tickers() -> set[str]:
     """Load preferred stock tickers from watchlist_preferred_tickers.txt."""
     return _load_tickers_from_file(WATCHLIST_PREFERRED_TICKERS_FILE)
 
 
+@functools.cache
 def load_cef_tickers() -> set[str]:
     """Load closed-end fund tickers from watchlist_cef_tickers.txt."""
     return _load_tickers_from_file(WATCHLIST_CEF_TICKERS_FILE)
 
 
+@functools.cache
 def load_all_watchlist_tickers() -> set[str]:
     """Combined watchlist: preferreds + CEFs (no duplicates)."""
     return load_preferred_tickers() | load_cef_tickers()
@@ -80,13 +143,14 @@ def get_watchlist_ciks() -> set[str]:
 
     sec_map = load_sec_ticker_map()
     ciks = set()
+    unresolved = set()
     for t in tickers:
         cik = sec_map.get(t)
         if cik:
             ciks.add(cik)
         else:
+            unresolved.add(t)
             LOG.debug("No SEC CIK for ticker %s", t)
-    unresolved = tickers - {t for t in tickers if sec_map.get(t)}
     if unresolved:
         LOG.info("Tickers with no SEC CIK (skipped): %s", sorted(unresolved))
     return ciks